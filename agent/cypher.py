@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+_RETURN_RE = re.compile(r"\bRETURN\b", re.IGNORECASE)
+_LIMIT_RE = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+_UNION_RE = re.compile(r"\bUNION\b", re.IGNORECASE)
+_READ_START_RE = re.compile(r"^(?:MATCH|OPTIONAL\s+MATCH|RETURN)\b", re.IGNORECASE)
+# Conservative: procedure calls are treated as writes so they reach the leader
+_WRITE_RE = re.compile(
+    r"\b(?:CREATE|MERGE|SET|DELETE|REMOVE|DROP|FOREACH|LOAD\s+CSV|CALL)\b",
+    re.IGNORECASE,
+)
+_IN_TRANSACTIONS_RE = re.compile(
+    r"\bIN\s+(?:\S+\s+CONCURRENT\s+)?TRANSACTIONS\b", re.IGNORECASE
+)
+# Comments, string literals and quoted identifiers can hide or fake keywords;
+# without a real tokenizer, queries containing them are never rewritten
+_OPAQUE_RE = re.compile(r"//|/\*|['\"`]")
+
+
+def with_limit(cypher: str, limit: int) -> Optional[str]:
+    """Append a server-side LIMIT to the final RETURN clause when it is safe.
+
+    Returns None when the query has no top-level trailing RETURN, already
+    limits it, uses UNION, or contains comments or quoted text; callers then
+    truncate client-side instead.
+    """
+    if _OPAQUE_RE.search(cypher):
+        return None
+    stripped = cypher.strip().rstrip(";")
+    if _UNION_RE.search(stripped):
+        return None
+    returns = list(_RETURN_RE.finditer(stripped))
+    if not returns:
+        return None
+    tail = stripped[returns[-1].end() :]
+    if "}" in tail or _LIMIT_RE.search(tail):
+        return None
+    return f"{stripped}\nLIMIT {int(limit)}"
+
+
+def is_read_only(cypher: str) -> bool:
+    """Return True only when cypher is certainly free of write clauses.
+
+    Anything the keyword scan can't vouch for (comments, quoted text,
+    procedure calls) is reported as a write.
+    """
+    if _OPAQUE_RE.search(cypher):
+        return False
+    stripped = cypher.strip()
+    return bool(_READ_START_RE.match(stripped)) and not _WRITE_RE.search(stripped)
+
+
+def needs_implicit_transaction(cypher: str) -> bool:
+    """Return True for Cypher that only runs in an auto-commit transaction.
+
+    CALL { ... } IN TRANSACTIONS is rejected inside managed transactions. A
+    false positive just falls back to auto-commit, so literals aren't parsed.
+    """
+    return bool(_IN_TRANSACTIONS_RE.search(cypher))
@@ -9,72 +9,76 @@ from google import genai as google_genai  # type: ignore
 from agent.tools import mcp_tools
 
 
+# MCP tools with exact names/signatures:
+# (name, description, input_schema, output_schema, handler)
+_TOOLS = (
+    (
+        "neo4j_search",
+        "Run parameterized Cypher against Neo4j",
+        {"cypher": "str", "params": "dict"},
+        {"records": "list", "summary": "str", "query_id": "str"},
+        mcp_tools.neo4j_search,
+    ),
+    (
+        "semantic_search",
+        "Generate candidate stored searches or Cypher from NLQ",
+        {"natural_language_query": "str", "top_k": "int"},
+        {"matches": "list", "summary": "str"},
+        mcp_tools.semantic_search,
+    ),
+    (
+        "fastapi_single_search_mcp",
+        "Bridge to existing FastAPI single-search by name",
+        {"search_name": "str", "params": "dict"},
+        {"result": "dict", "api_status": "int"},
+        mcp_tools.fastapi_single_search_mcp,
+    ),
+    (
+        "memory_save",
+        "Persist one user+assistant turn to memory",
+        {
+            "session_id": "str",
+            "turn": "int",
+            "user": "str",
+            "assistant": "str",
+            "metadata": "dict",
+        },
+        {"ok": "bool", "entry_id": "str"},
+        mcp_tools.memory_save,
+    ),
+    (
+        "memory_query",
+        "Query conversation memory for a session",
+        {"session_id": "str", "query": "str", "limit": "int"},
+        {"matches": "list"},
+        mcp_tools.memory_query,
+    ),
+    (
+        "memory_switch",
+        "Switch memory backend and optionally migrate",
+        {"backend": "str", "connection": "dict"},
+        {"ok": "bool", "backend": "str"},
+        mcp_tools.memory_switch,
+    ),
+)
+
+
 def build_agent() -> Agent:
     model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite")
     # ADK Agent with Vertex/Gemini preferences
     agent = Agent(model=model)
 
-    # Register MCP tools with exact names/signatures
-    agent.register_tool(
-        Tool(
-            name="neo4j_search",
-            description="Run parameterized Cypher against Neo4j",
-            input_schema={"cypher": "str", "params": "dict"},
-            output_schema={"records": "list", "summary": "str", "query_id": "str"},
-            handler=lambda input: mcp_tools.neo4j_search(input),
-        )
-    )
-    agent.register_tool(
-        Tool(
-            name="semantic_search",
-            description="Generate candidate stored searches or Cypher from NLQ",
-            input_schema={"natural_language_query": "str", "top_k": "int"},
-            output_schema={"matches": "list", "summary": "str"},
-            handler=lambda input: mcp_tools.semantic_search(input),
-        )
-    )
-    agent.register_tool(
-        Tool(
-            name="fastapi_single_search_mcp",
-            description="Bridge to existing FastAPI single-search by name",
-            input_schema={"search_name": "str", "params": "dict"},
-            output_schema={"result": "dict", "api_status": "int"},
-            handler=lambda input: mcp_tools.fastapi_single_search_mcp(input),
-        )
-    )
-    agent.register_tool(
-        Tool(
-            name="memory_save",
-            description="Persist one user+assistant turn to memory",
-            input_schema={
-                "session_id": "str",
-                "turn": "int",
-                "user": "str",
-                "assistant": "str",
-                "metadata": "dict",
-            },
-            output_schema={"ok": "bool", "entry_id": "str"},
-            handler=lambda input: mcp_tools.memory_save(input),
-        )
-    )
-    agent.register_tool(
-        Tool(
-            name="memory_query",
-            description="Query conversation memory for a session",
-            input_schema={"session_id": "str", "query": "str", "limit": "int"},
-            output_schema={"matches": "list"},
-            handler=lambda input: mcp_tools.memory_query(input),
-        )
-    )
-    agent.register_tool(
-        Tool(
-            name="memory_switch",
-            description="Switch memory backend and optionally migrate",
-            input_schema={"backend": "str", "connection": "dict"},
-            output_schema={"ok": "bool", "backend": "str"},
-            handler=lambda input: mcp_tools.memory_switch(input),
+    # Register MCP tools; handlers already take the tool input dict
+    for name, desc, ins, outs, fn in _TOOLS:
+        agent.register_tool(
+            Tool(
+                name=name,
+                description=desc,
+                input_schema=ins,
+                output_schema=outs,
+                handler=fn,
+            )
         )
-    )
     return agent
 
 
@@ -1,12 +1,29 @@
 from __future__ import annotations
 
+import atexit
+import logging
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import psycopg
+from google.api_core.exceptions import Aborted
 from google.cloud import firestore
+from psycopg_pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Words as Postgres' 'simple' text search parser splits them: punctuation and
+# underscores separate tokens
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
 
 
 @dataclass
@@ -15,7 +32,7 @@ class MemoryEntry:
     turn: int
     speaker: str
     text: str
-    timestamp: str
+    timestamp: datetime
     metadata: Dict[str, Any]
 
 
@@ -23,16 +40,90 @@ class MemoryBackend:
     def save(self, entry: MemoryEntry) -> str:
         raise NotImplementedError
 
+    def save_many(self, entries: List[MemoryEntry]) -> List[str]:
+        """Persist entries in order; backends override this to batch writes."""
+        return [self.save(entry) for entry in entries]
+
     def query(self, session_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
         raise NotImplementedError
 
+    def close(self) -> None:
+        pass
+
+
+_SPEAKERS = ("user", "assistant")
+
+
+def _latest_per_turn(entries: List[MemoryEntry]) -> List[MemoryEntry]:
+    latest: Dict[Tuple[str, int], MemoryEntry] = {}
+    for entry in entries:
+        latest[(entry.session_id, entry.turn)] = entry
+    return list(latest.values())
+
+
+def _pg_select(session_id: str, query: str, limit: int) -> Tuple[str, tuple]:
+    # Full-text match backed by the GIN index on text_tsv; an empty query
+    # returns the most recent turns for the session
+    q = query.strip()
+    if q.lower() in _SPEAKERS:
+        # A query naming a speaker also matches that speaker's turns;
+        # speaker has only two values, so it is compared by equality
+        # rather than ILIKE
+        select_sql = """
+            SELECT turn, speaker, text, timestamp, metadata
+            FROM conversation_memory
+            WHERE session_id = %s
+                AND (text_tsv @@ plainto_tsquery('simple', %s) OR speaker = %s)
+            ORDER BY ts_rank_cd(text_tsv, plainto_tsquery('simple', %s)) DESC, turn DESC
+            LIMIT %s
+            """
+        params: tuple = (session_id, query, q.lower(), query, limit)
+    elif q:
+        select_sql = """
+            SELECT turn, speaker, text, timestamp, metadata
+            FROM conversation_memory
+            WHERE session_id = %s AND text_tsv @@ plainto_tsquery('simple', %s)
+            ORDER BY ts_rank_cd(text_tsv, plainto_tsquery('simple', %s)) DESC, turn DESC
+            LIMIT %s
+            """
+        params = (session_id, query, query, limit)
+    else:
+        select_sql = """
+            SELECT turn, speaker, text, timestamp, metadata
+            FROM conversation_memory
+            WHERE session_id = %s
+            ORDER BY turn DESC
+            LIMIT %s
+            """
+        params = (session_id, limit)
+    return select_sql, params
+
 
 class PostgresMemory(MemoryBackend):
     def __init__(self, dsn: Optional[str] = None) -> None:
         self._dsn = dsn or os.getenv("POSTGRES_DSN")
         if not self._dsn:
             raise ValueError("POSTGRES_DSN must be set for Postgres memory backend")
-        self._ensure_schema()
+        # Probe once so a bad DSN raises the real OperationalError right away
+        # instead of a PoolTimeout after the pool's acquire timeout
+        psycopg.connect(self._dsn).close()
+        # Pooled connections amortize TCP/TLS/auth handshakes across calls;
+        # pool.connection() commits on clean exit and rolls back on error
+        self._pool = ConnectionPool(
+            self._dsn,
+            min_size=2,
+            max_size=20,
+            kwargs={"autocommit": False},
+            open=True,
+        )
+        try:
+            self._ensure_schema()
+        except Exception:
+            self._pool.close()
+            raise
+
+    def close(self) -> None:
+        self._pool.close()
 
     def _ensure_schema(self) -> None:
         create_sql = """
@@ -43,53 +134,82 @@ class PostgresMemory(MemoryBackend):
                 text TEXT NOT NULL,
                 timestamp TIMESTAMPTZ NOT NULL,
                 metadata JSONB NOT NULL,
+                text_tsv tsvector GENERATED ALWAYS AS (to_tsvector('simple', text)) STORED,
                 PRIMARY KEY(session_id, turn)
             );
             CREATE INDEX IF NOT EXISTS idx_session_turn ON conversation_memory(session_id, turn);
             """
-        with psycopg.connect(self._dsn) as conn:
+        # Tables created before text_tsv existed need the column added once;
+        # ALTER TABLE takes an ACCESS EXCLUSIVE lock even when IF NOT EXISTS is
+        # a no-op, so it only runs after this check finds the column missing
+        has_tsv_sql = """
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema()
+                AND table_name = 'conversation_memory'
+                AND column_name = 'text_tsv'
+            """
+        add_tsv_sql = """
+            ALTER TABLE conversation_memory ADD COLUMN IF NOT EXISTS text_tsv tsvector
+                GENERATED ALWAYS AS (to_tsvector('simple', text)) STORED
+            """
+        tsv_index_sql = """
+            CREATE INDEX IF NOT EXISTS idx_mem_tsv ON conversation_memory USING GIN(text_tsv)
+            """
+        with self._pool.connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(create_sql)
-                conn.commit()
+                cur.execute(has_tsv_sql)
+                if cur.fetchone() is None:
+                    cur.execute(add_tsv_sql)
+                cur.execute(tsv_index_sql)
+
+    _INSERT_SQL = """
+        INSERT INTO conversation_memory (session_id, turn, speaker, text, timestamp, metadata)
+        VALUES {values}
+        ON CONFLICT (session_id, turn) DO UPDATE SET
+            speaker = EXCLUDED.speaker,
+            text = EXCLUDED.text,
+            timestamp = EXCLUDED.timestamp,
+            metadata = EXCLUDED.metadata
+        """
+
+    @staticmethod
+    def _row(entry: MemoryEntry) -> tuple:
+        return (
+            entry.session_id,
+            entry.turn,
+            entry.speaker,
+            entry.text,
+            entry.timestamp,
+            entry.metadata,
+        )
 
     def save(self, entry: MemoryEntry) -> str:
-        insert_sql = """
-            INSERT INTO conversation_memory (session_id, turn, speaker, text, timestamp, metadata)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (session_id, turn) DO UPDATE SET
-                speaker = EXCLUDED.speaker,
-                text = EXCLUDED.text,
-                timestamp = EXCLUDED.timestamp,
-                metadata = EXCLUDED.metadata
-            """
-        with psycopg.connect(self._dsn) as conn:
+        return self.save_many([entry])[0]
+
+    def save_many(self, entries: List[MemoryEntry]) -> List[str]:
+        """Upsert all entries with a single multi-row INSERT (one round-trip)."""
+        if not entries:
+            return []
+        # One upsert can't touch the same key twice; keep the last entry per
+        # key, matching sequential save() and Firestore batches
+        rows = _latest_per_turn(entries)
+        insert_sql = self._INSERT_SQL.format(
+            values=", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(rows))
+        )
+        params = [value for entry in rows for value in self._row(entry)]
+        with self._pool.connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    insert_sql,
-                    (
-                        entry.session_id,
-                        entry.turn,
-                        entry.speaker,
-                        entry.text,
-                        datetime.fromisoformat(entry.timestamp),
-                        entry.metadata,
-                    ),
-                )
-                conn.commit()
-        return f"pg:{entry.session_id}:{entry.turn}"
+                # Prepared per pooled connection: parsed and planned once
+                cur.execute(insert_sql, params, prepare=True)
+        return [f"pg:{entry.session_id}:{entry.turn}" for entry in entries]
 
     def query(self, session_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
-        select_sql = """
-            SELECT turn, speaker, text, timestamp, metadata
-            FROM conversation_memory
-            WHERE session_id = %s AND (text ILIKE %s OR speaker ILIKE %s)
-            ORDER BY turn DESC
-            LIMIT %s
-            """
-        like = f"%{query}%"
-        with psycopg.connect(self._dsn) as conn:
+        select_sql, params = _pg_select(session_id, query, limit)
+        with self._pool.connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(select_sql, (session_id, like, like, limit))
+                # Prepared per pooled connection: parsed and planned once
+                cur.execute(select_sql, params, prepare=True)
                 rows = cur.fetchall()
         matches: List[Dict[str, Any]] = []
         for row in rows:
@@ -105,6 +225,11 @@ class PostgresMemory(MemoryBackend):
 
 
 class FirestoreMemory(MemoryBackend):
+    # Firestore caps a single WriteBatch at 500 operations
+    _BATCH_SIZE = 500
+    _MAX_RETRIES = 5
+    _MAX_WORKERS = 10
+
     def __init__(self, project: Optional[str] = None) -> None:
         self._project = project or os.getenv("FIRESTORE_PROJECT")
         if not self._project:
@@ -114,85 +239,177 @@ class FirestoreMemory(MemoryBackend):
         self._client = firestore.Client(project=self._project)
         self._collection = self._client.collection("conversation_memory")
 
+    @staticmethod
+    def _doc_id(entry: MemoryEntry) -> str:
+        return f"{entry.session_id}:{entry.turn}"
+
+    @staticmethod
+    def _doc(entry: MemoryEntry) -> Dict[str, Any]:
+        return {
+            "session_id": entry.session_id,
+            "turn": entry.turn,
+            "speaker": entry.speaker,
+            "text": entry.text,
+            "timestamp": iso(entry.timestamp),
+            "metadata": entry.metadata,
+            # Lowercased word tokens let query() filter server-side
+            "tokens": sorted(set(_tokenize(entry.text))),
+        }
+
     def save(self, entry: MemoryEntry) -> str:
-        doc_id = f"{entry.session_id}:{entry.turn}"
-        self._collection.document(doc_id).set(
-            {
-                "session_id": entry.session_id,
-                "turn": entry.turn,
-                "speaker": entry.speaker,
-                "text": entry.text,
-                "timestamp": entry.timestamp,
-                "metadata": entry.metadata,
-            }
-        )
-        return f"fs:{doc_id}"
+        return self.save_many([entry])[0]
+
+    def _commit_batch(self, entries: List[MemoryEntry]) -> None:
+        for attempt in range(self._MAX_RETRIES):
+            batch = self._client.batch()
+            for entry in entries:
+                batch.set(
+                    self._collection.document(self._doc_id(entry)), self._doc(entry)
+                )
+            try:
+                batch.commit()
+                return
+            except Aborted:
+                if attempt == self._MAX_RETRIES - 1:
+                    raise
+                time.sleep(0.1 * 2**attempt)
+
+    def save_many(self, entries: List[MemoryEntry]) -> List[str]:
+        """Write entries via WriteBatch commits of at most 500 operations each.
+
+        Multiple batches are committed concurrently on a short-lived thread pool;
+        each batch is retried with exponential backoff on contention aborts.
+        """
+        if not entries:
+            return []
+        chunks = [
+            entries[i : i + self._BATCH_SIZE]
+            for i in range(0, len(entries), self._BATCH_SIZE)
+        ]
+        if len(chunks) == 1:
+            self._commit_batch(chunks[0])
+        else:
+            workers = min(self._MAX_WORKERS, len(chunks))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # list() surfaces the first failed commit
+                list(pool.map(self._commit_batch, chunks))
+        return [f"fs:{self._doc_id(entry)}" for entry in entries]
+
+    # Firestore caps array-contains-any at a fixed number of comparison values;
+    # query words beyond this are ignored
+    _MAX_QUERY_TOKENS = 10
 
     def query(self, session_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
-        # Firestore doesn't support full-text; perform prefix/contains via client-side filter after fetching by session
+        """Return the session's latest turns that contain ANY of the query words.
+
+        Firestore has no full-text search, so words are matched against the
+        tokens stored on save via array_contains_any (needs a
+        session_id/tokens/turn composite index). This is OR across words,
+        whereas Postgres' plainto_tsquery requires every word.
+        """
+        speaker = query.strip().lower()
+        tokens = list(dict.fromkeys(_tokenize(query)))
+        if speaker and not tokens:
+            # Punctuation-only queries match nothing, as in Postgres
+            return []
+        if len(tokens) > self._MAX_QUERY_TOKENS:
+            logger.warning(
+                "memory query has %d words; matching only the first %d",
+                len(tokens),
+                self._MAX_QUERY_TOKENS,
+            )
+            tokens = tokens[: self._MAX_QUERY_TOKENS]
+        base = self._collection.where("session_id", "==", session_id)
+        queries = [base]
+        if tokens:
+            queries = [base.where("tokens", "array_contains_any", tokens)]
+        if speaker in _SPEAKERS:
+            # Same rule as Postgres: a speaker name also matches that speaker's turns
+            queries.append(base.where("speaker", "==", speaker))
+        found: Dict[int, Dict[str, Any]] = {}
+        for fs_query in queries:
+            for data in self._stream_latest(fs_query, limit):
+                found[int(data.get("turn", 0))] = data
+        if tokens and len(found) < limit:
+            # Documents written before tokens were stored can't be matched
+            # server-side; scan recent session turns for them client-side
+            wanted = set(tokens)
+            for data in self._stream_latest(base, limit * 2):
+                if "tokens" in data:
+                    continue
+                if wanted & set(_tokenize(str(data.get("text", "")))) or (
+                    speaker in _SPEAKERS and data.get("speaker") == speaker
+                ):
+                    found.setdefault(int(data.get("turn", 0)), data)
+        matches: List[Dict[str, Any]] = []
+        for turn in sorted(found, reverse=True)[:limit]:
+            data = found[turn]
+            matches.append(
+                {
+                    "turn": turn,
+                    "text": str(data.get("text", "")),
+                    "timestamp": str(data.get("timestamp", "")),
+                }
+            )
+        return matches
+
+    @staticmethod
+    def _stream_latest(fs_query: Any, limit: int) -> List[Dict[str, Any]]:
         docs = (
-            self._collection.where("session_id", "==", session_id)
-            .order_by("turn", direction=firestore.Query.DESCENDING)
-            .limit(limit * 2)
+            fs_query.order_by("turn", direction=firestore.Query.DESCENDING)
+            .limit(limit)
             .stream()
         )
-        matches: List[Dict[str, Any]] = []
-        q = query.lower()
-        for doc in docs:
-            data = doc.to_dict()
-            if (
-                q in str(data.get("text", "")).lower()
-                or q in str(data.get("speaker", "")).lower()
-            ):
-                matches.append(
-                    {
-                        "turn": int(data.get("turn", 0)),
-                        "text": str(data.get("text", "")),
-                        "timestamp": str(data.get("timestamp", "")),
-                    }
-                )
-                if len(matches) >= limit:
-                    break
-        return matches
+        return [doc.to_dict() for doc in docs]
 
 
 _memory_backend: Optional[MemoryBackend] = None
 
 
 def get_memory_backend() -> MemoryBackend:
-    global _memory_backend
     if _memory_backend is None:
         backend = os.getenv("MEMORY_BACKEND", "postgres").lower()
         if backend == "postgres":
-            _memory_backend = PostgresMemory()
+            _set_backend(PostgresMemory())
         elif backend == "firestore":
-            _memory_backend = FirestoreMemory()
+            _set_backend(FirestoreMemory())
         else:
             raise ValueError("MEMORY_BACKEND must be 'postgres' or 'firestore'")
     return _memory_backend
 
 
+def _set_backend(backend: MemoryBackend) -> None:
+    global _memory_backend
+    _memory_backend = backend
+    # A replaced backend stays open for calls still using it; every backend's
+    # pool is drained on process shutdown instead
+    atexit.register(backend.close)
+
+
 def switch_memory_backend(
     target_backend: str, connection: Dict[str, Any]
 ) -> Dict[str, Any]:
-    global _memory_backend
     target = target_backend.lower()
     if target == "postgres":
         dsn = connection.get("dsn") or os.getenv("POSTGRES_DSN")
         os.environ["MEMORY_BACKEND"] = "postgres"
         if dsn:
             os.environ["POSTGRES_DSN"] = dsn
-        _memory_backend = PostgresMemory(dsn=dsn)
+        _set_backend(PostgresMemory(dsn=dsn))
         return {"ok": True, "backend": "postgres"}
     if target == "firestore":
         project = connection.get("project") or os.getenv("FIRESTORE_PROJECT")
         os.environ["MEMORY_BACKEND"] = "firestore"
         if project:
             os.environ["FIRESTORE_PROJECT"] = project
-        _memory_backend = FirestoreMemory(project=project)
+        _set_backend(FirestoreMemory(project=project))
         return {"ok": True, "backend": "firestore"}
     return {"ok": False, "backend": target}
 
 
-def now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def iso(ts: datetime) -> str:
+    return ts.isoformat()
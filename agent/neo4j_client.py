@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import atexit
+import itertools
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from neo4j import GraphDatabase, Driver
+from neo4j import GraphDatabase, Driver, ManagedTransaction, Session
+
+from agent.cypher import is_read_only, needs_implicit_transaction, with_limit
 
 
 class Neo4jClient:
@@ -18,6 +22,9 @@ class Neo4jClient:
         uri: Optional[str] = None,
         user: Optional[str] = None,
         password: Optional[str] = None,
+        max_connection_pool_size: int = 50,
+        connection_acquisition_timeout: float = 30,
+        max_connection_lifetime: float = 3600,
     ) -> None:
         self._uri = uri or os.getenv("NEO4J_URI")
         self._user = user or os.getenv("NEO4J_USER")
@@ -25,7 +32,11 @@ class Neo4jClient:
         if not self._uri or not self._user or not self._password:
             raise ValueError("NEO4J_URI, NEO4J_USER, and NEO4J_PASSWORD must be set")
         self._driver: Driver = GraphDatabase.driver(
-            self._uri, auth=(self._user, self._password)
+            self._uri,
+            auth=(self._user, self._password),
+            max_connection_pool_size=max_connection_pool_size,
+            connection_acquisition_timeout=connection_acquisition_timeout,
+            max_connection_lifetime=max_connection_lifetime,
         )
 
     def close(self) -> None:
@@ -39,22 +50,37 @@ class Neo4jClient:
         Returns a dict: {"records": List[Dict], "summary": str, "query_id": str}
         """
         parameters = params or {}
-        with self._driver.session() as session:
-            result = session.run(cypher, parameters=parameters)
-            # Collect top records up to limit
-            records: List[Dict[str, Any]] = []
-            for idx, record in enumerate(result):
-                if idx >= limit:
-                    break
-                # Convert to plain dict
-                records.append(record.data())
-
-            summary_obj = result.consume()
-            query_id = getattr(summary_obj, "query_id", None) or getattr(
-                summary_obj, "query", None
-            )
-            summary = f"{summary_obj.counters}"
-            return {"records": records, "summary": summary, "query_id": str(query_id)}
+        limited = with_limit(cypher, limit)
+
+        def _work(
+            tx: Union[ManagedTransaction, Session]
+        ) -> Tuple[List[Dict[str, Any]], Any]:
+            # Records and summary are fully consumed inside the transaction so
+            # the driver can retry the whole unit of work on transient errors
+            if limited is not None:
+                result = tx.run(limited, parameters)
+                records: List[Dict[str, Any]] = [r.data() for r in result]
+            else:
+                result = tx.run(cypher, parameters)
+                # Collect top records up to limit as plain dicts
+                records = [r.data() for r in itertools.islice(result, limit)]
+            return records, result.consume()
+
+        # The driver-wide bookmark manager gives causal consistency across
+        # sessions, so a read routed to a follower sees earlier writes
+        with self._driver.session(
+            bookmark_manager=self._driver.execute_query_bookmark_manager
+        ) as session:
+            if needs_implicit_transaction(cypher):
+                records, summary_obj = _work(session)
+            elif is_read_only(cypher):
+                records, summary_obj = session.execute_read(_work)
+            else:
+                records, summary_obj = session.execute_write(_work)
+        # summary.query holds the LIMIT-rewritten text; audit the caller's cypher
+        query_id = getattr(summary_obj, "query_id", None) or cypher
+        summary = f"{summary_obj.counters}"
+        return {"records": records, "summary": summary, "query_id": str(query_id)}
 
 
 _neo4j_singleton: Optional[Neo4jClient] = None
@@ -64,4 +90,6 @@ def get_neo4j_client() -> Neo4jClient:
     global _neo4j_singleton
     if _neo4j_singleton is None:
         _neo4j_singleton = Neo4jClient()
+        # Drain the driver's connection pool cleanly on process shutdown
+        atexit.register(_neo4j_singleton.close)
     return _neo4j_singleton
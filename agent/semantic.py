@@ -1,34 +1,63 @@
 from __future__ import annotations
 
-from typing import Dict, List
+import functools
+import re
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
 
 
-def semantic_search_candidates(
-    natural_language_query: str, top_k: int = 3
-) -> Dict[str, object]:
-    text = natural_language_query.strip()
-    # Simple heuristic stub to propose candidate stored searches or cypher
-    candidates: List[Dict[str, object]] = []
-    lowered = text.lower()
-    if "dispute" in lowered or "disputes" in lowered:
-        candidates.append(
+# Keyword templates in emission order; each alternative maps to a named group
+_TEMPLATES: Tuple[Tuple[str, str, Mapping[str, object]], ...] = (
+    (
+        "disputes",
+        r"dispute",
+        MappingProxyType(
             {
                 "score": 0.92,
                 "query": "credit_disputes_recent",
                 "query_id": "stored:credit_disputes_recent",
             }
-        )
-    if "high risk" in lowered or "risk score" in lowered:
-        candidates.append(
+        ),
+    ),
+    (
+        "high_risk",
+        r"high risk|risk score",
+        MappingProxyType(
             {
                 "score": 0.88,
                 "query": "MATCH (c:Customer)-[r:HAS_RISK]->(s:Score) WHERE s.value > $min RETURN c,r,s ORDER BY s.value DESC LIMIT 100",
                 "query_id": "cypher:high_risk_scores",
             }
-        )
+        ),
+    ),
+)
+# Single alternation so the query text is scanned once for every keyword
+_KEYWORD_RE = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in _TEMPLATES),
+    re.IGNORECASE,
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _candidates(text: str, top_k: int) -> Tuple[Mapping[str, object], ...]:
+    # Simple heuristic stub to propose candidate stored searches or cypher
+    matched = {m.lastgroup for m in _KEYWORD_RE.finditer(text)}
+    candidates: List[Mapping[str, object]] = [
+        candidate for name, _, candidate in _TEMPLATES if name in matched
+    ]
     # generic fallback
-    candidates.append({"score": 0.5, "query": text, "query_id": "nl:fallback"})
+    candidates.append(
+        MappingProxyType({"score": 0.5, "query": text, "query_id": "nl:fallback"})
+    )
+    return tuple(candidates[:top_k])
+
+
+def semantic_search_candidates(
+    natural_language_query: str, top_k: int = 3
+) -> Dict[str, object]:
+    text = natural_language_query.strip()
+    # Cached results are read-only; hand callers fresh dicts they may mutate
     return {
-        "matches": candidates[:top_k],
+        "matches": [dict(c) for c in _candidates(text, top_k)],
         "summary": "Generated candidate queries from natural language.",
     }
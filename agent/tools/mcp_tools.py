@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+import logging
 from typing import Any, Dict
 
 from agent.neo4j_client import get_neo4j_client
-from agent.memory import MemoryEntry, get_memory_backend, switch_memory_backend, now_iso
+from agent.memory import MemoryEntry, get_memory_backend, switch_memory_backend, now_utc
 from agent.semantic import semantic_search_candidates
 
+logger = logging.getLogger(__name__)
+
 
 def neo4j_search(input: Dict[str, Any]) -> Dict[str, Any]:
     cypher = str(input.get("cypher", ""))
-    params = dict(input.get("params", {}))
+    params = input.get("params") or {}
     client = get_neo4j_client()
     return client.run_query(cypher, params=params)
 
@@ -23,7 +26,7 @@ def semantic_search(input: Dict[str, Any]) -> Dict[str, Any]:
 def fastapi_single_search_mcp(input: Dict[str, Any]) -> Dict[str, Any]:
     # Bridge placeholder; assumes existing FastAPI function by name
     search_name = str(input.get("search_name", ""))
-    params = dict(input.get("params", {}))
+    params = input.get("params") or {}
     # Stubbed response to satisfy tool contract
     return {"result": {"search": search_name, "params": params}, "api_status": 200}
 
@@ -33,15 +36,17 @@ def memory_save(input: Dict[str, Any]) -> Dict[str, Any]:
     turn = int(input.get("turn"))
     user = str(input.get("user"))
     assistant = str(input.get("assistant"))
-    metadata = dict(input.get("metadata", {}))
+    metadata = input.get("metadata") or {}
     backend = get_memory_backend()
+    # Both halves of the turn share one timestamp
+    ts = now_utc()
     # Save both user and assistant turns for audit
     user_entry = MemoryEntry(
         session_id=session_id,
         turn=turn * 2 - 1,
         speaker="user",
         text=user,
-        timestamp=now_iso(),
+        timestamp=ts,
         metadata=metadata,
     )
     assistant_entry = MemoryEntry(
@@ -49,11 +54,15 @@ def memory_save(input: Dict[str, Any]) -> Dict[str, Any]:
         turn=turn * 2,
         speaker="assistant",
         text=assistant,
-        timestamp=now_iso(),
+        timestamp=ts,
         metadata=metadata,
     )
-    user_id = backend.save(user_entry)
-    assistant_id = backend.save(assistant_entry)
+    try:
+        # Both rows go to the backend in a single batched write
+        user_id, assistant_id = backend.save_many([user_entry, assistant_entry])
+    except Exception:
+        logger.exception("memory_save failed for session %s", session_id)
+        return {"ok": False, "entry_id": ""}
     return {"ok": True, "entry_id": assistant_id or user_id}
 
 
@@ -68,5 +77,5 @@ def memory_query(input: Dict[str, Any]) -> Dict[str, Any]:
 
 def memory_switch(input: Dict[str, Any]) -> Dict[str, Any]:
     backend = str(input.get("backend"))
-    connection = dict(input.get("connection", {}))
+    connection = input.get("connection") or {}
     return switch_memory_backend(backend, connection)
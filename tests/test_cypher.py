@@ -0,0 +1,68 @@
+from agent.cypher import is_read_only, needs_implicit_transaction, with_limit
+
+
+def test_is_read_only_plain_reads():
+    assert is_read_only("MATCH (n) RETURN n")
+    assert is_read_only("  optional match (n) return n")
+    assert is_read_only("RETURN 1")
+
+
+def test_is_read_only_write_clauses():
+    assert not is_read_only("MATCH (n) SET n.seen = true")
+    assert not is_read_only("CREATE (n)")
+    assert not is_read_only("MATCH (n) DETACH DELETE n")
+    assert not is_read_only("MERGE (n:Customer {id: $id}) RETURN n")
+
+
+def test_is_read_only_procedure_calls_are_writes():
+    assert not is_read_only("CALL db.labels()")
+    assert not is_read_only("MATCH (n) CALL { WITH n RETURN n } RETURN n")
+
+
+def test_is_read_only_string_literal_with_slashes():
+    # '//' inside a literal must not hide the trailing SET
+    assert not is_read_only("MATCH (n) WHERE n.url = 'http://x' SET n.seen = true")
+    assert not is_read_only("MATCH (n) WHERE n.url = 'http://x' RETURN n")
+
+
+def test_is_read_only_comments_and_quoted_identifiers():
+    assert not is_read_only("// note\nMATCH (n) RETURN n")
+    assert not is_read_only("MATCH (n) /* x */ RETURN n")
+    assert not is_read_only('MATCH (n) WHERE n.name = "a" RETURN n')
+    assert not is_read_only("MATCH (n:`Label`) RETURN n")
+
+
+def test_with_limit_appends_to_trailing_return():
+    assert with_limit("MATCH (n) RETURN n", 10) == "MATCH (n) RETURN n\nLIMIT 10"
+    assert with_limit("MATCH (n) RETURN n;", 10) == "MATCH (n) RETURN n\nLIMIT 10"
+    assert (
+        with_limit("MATCH (n) RETURN n SKIP 3", 5) == "MATCH (n) RETURN n SKIP 3\nLIMIT 5"
+    )
+
+
+def test_with_limit_keeps_existing_limit():
+    assert with_limit("MATCH (n) RETURN n LIMIT 5", 10) is None
+    assert with_limit("MATCH (n) RETURN n LIMIT $max", 10) is None
+
+
+def test_with_limit_skips_unsafe_shapes():
+    assert with_limit("CREATE (n)", 10) is None
+    assert with_limit("MATCH (a) RETURN a UNION MATCH (b) RETURN b", 10) is None
+    assert with_limit("CALL { MATCH (n) RETURN n } WITH n SET n.x = 1", 10) is None
+
+
+def test_with_limit_skips_comments_and_literals():
+    assert with_limit("MATCH (n) RETURN n // trailing", 10) is None
+    assert with_limit("MATCH (n) RETURN 'a//b' LIMIT 5", 10) is None
+    assert with_limit("MATCH (n) WHERE n.url = 'http://x' RETURN n", 10) is None
+
+
+def test_needs_implicit_transaction():
+    assert needs_implicit_transaction(
+        "LOAD CSV FROM $url AS row CALL { WITH row CREATE (:N {v: row[0]}) } IN TRANSACTIONS"
+    )
+    assert needs_implicit_transaction(
+        "MATCH (n) CALL { WITH n DETACH DELETE n } in 3 concurrent transactions of 100 rows"
+    )
+    assert not needs_implicit_transaction("MATCH (n) RETURN n")
+    assert not needs_implicit_transaction("CALL { MATCH (n) RETURN n } RETURN n")
@@ -0,0 +1,155 @@
+from datetime import datetime, timezone
+
+from agent.memory import (
+    FirestoreMemory,
+    MemoryEntry,
+    _latest_per_turn,
+    _pg_select,
+    _tokenize,
+)
+
+
+class _Doc:
+    def __init__(self, data):
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class _FakeQuery:
+    """Minimal stand-in for the subset of the Firestore query API memory uses."""
+
+    def __init__(self, docs, filters=(), limit=None):
+        self._docs = docs
+        self._filters = filters
+        self._limit = limit
+
+    def where(self, field, op, value):
+        return _FakeQuery(self._docs, self._filters + ((field, op, value),), self._limit)
+
+    def order_by(self, field, direction=None):
+        return self
+
+    def limit(self, count):
+        return _FakeQuery(self._docs, self._filters, count)
+
+    def _matches(self, doc):
+        for field, op, value in self._filters:
+            if op == "==" and doc.get(field) != value:
+                return False
+            if op == "array_contains_any" and not set(doc.get(field, ())) & set(value):
+                return False
+        return True
+
+    def stream(self):
+        docs = sorted(
+            (d for d in self._docs if self._matches(d)),
+            key=lambda d: d["turn"],
+            reverse=True,
+        )
+        return [_Doc(d) for d in docs[: self._limit]]
+
+
+def _firestore(docs):
+    memory = FirestoreMemory.__new__(FirestoreMemory)
+    memory._collection = _FakeQuery(docs)
+    return memory
+
+
+def _fs_doc(turn, speaker, text, session_id="s1", tokens=True):
+    doc = {
+        "session_id": session_id,
+        "turn": turn,
+        "speaker": speaker,
+        "text": text,
+        "timestamp": f"t{turn}",
+    }
+    if tokens:
+        doc["tokens"] = sorted(set(_tokenize(text)))
+    return doc
+
+
+def test_tokenize_lowercases_and_drops_punctuation():
+    assert _tokenize("Hello, World! it's foo_bar 42") == [
+        "hello",
+        "world",
+        "it",
+        "s",
+        "foo",
+        "bar",
+        "42",
+    ]
+    assert _tokenize("?!") == []
+
+
+def test_latest_per_turn_keeps_last_entry():
+    ts = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    first = MemoryEntry("s1", 1, "user", "a", ts, {})
+    other = MemoryEntry("s1", 2, "user", "b", ts, {})
+    last = MemoryEntry("s1", 1, "user", "c", ts, {})
+    assert _latest_per_turn([first, other, last]) == [last, other]
+
+
+def test_pg_select_speaker_query_also_matches_speaker():
+    sql, params = _pg_select("s1", " User ", 5)
+    assert "OR speaker = %s" in sql
+    assert params == ("s1", " User ", "user", " User ", 5)
+
+
+def test_pg_select_full_text():
+    sql, params = _pg_select("s1", "refund status", 5)
+    assert "plainto_tsquery" in sql
+    assert "speaker" not in sql.split("WHERE", 1)[1]
+    assert params == ("s1", "refund status", "refund status", 5)
+
+
+def test_pg_select_empty_query_returns_recent_turns():
+    sql, params = _pg_select("s1", "   ", 5)
+    assert "plainto_tsquery" not in sql
+    assert "ORDER BY turn DESC" in sql
+    assert params == ("s1", 5)
+
+
+def test_firestore_query_merges_speaker_and_token_matches_by_turn():
+    memory = _firestore(
+        [
+            _fs_doc(1, "user", "hello there"),
+            _fs_doc(2, "assistant", "a user asked"),
+            _fs_doc(3, "user", "bye"),
+            _fs_doc(4, "assistant", "nothing here"),
+            _fs_doc(1, "user", "user", session_id="s2"),
+        ]
+    )
+    matches = memory.query("s1", "user", 10)
+    assert [m["turn"] for m in matches] == [3, 2, 1]
+    assert matches[0] == {"turn": 3, "text": "bye", "timestamp": "t3"}
+    assert [m["turn"] for m in memory.query("s1", "user", 2)] == [3, 2]
+
+
+def test_firestore_query_matches_any_word():
+    memory = _firestore(
+        [
+            _fs_doc(1, "user", "refund please"),
+            _fs_doc(2, "assistant", "status is pending"),
+            _fs_doc(3, "user", "thanks"),
+        ]
+    )
+    assert [m["turn"] for m in memory.query("s1", "Refund STATUS", 10)] == [2, 1]
+
+
+def test_firestore_query_finds_legacy_docs_without_tokens():
+    memory = _firestore(
+        [
+            _fs_doc(1, "user", "old refund question", tokens=False),
+            _fs_doc(2, "assistant", "new refund answer"),
+            _fs_doc(3, "user", "unrelated", tokens=False),
+        ]
+    )
+    assert [m["turn"] for m in memory.query("s1", "refund", 10)] == [2, 1]
+
+
+def test_firestore_query_empty_and_punctuation_only():
+    memory = _firestore([_fs_doc(1, "user", "hello"), _fs_doc(2, "assistant", "hi")])
+    assert [m["turn"] for m in memory.query("s1", "", 10)] == [2, 1]
+    assert memory.query("s1", "?!", 10) == []
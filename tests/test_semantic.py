@@ -0,0 +1,55 @@
+from agent.semantic import semantic_search_candidates
+
+SUMMARY = "Generated candidate queries from natural language."
+DISPUTES = {
+    "score": 0.92,
+    "query": "credit_disputes_recent",
+    "query_id": "stored:credit_disputes_recent",
+}
+HIGH_RISK = {
+    "score": 0.88,
+    "query": "MATCH (c:Customer)-[r:HAS_RISK]->(s:Score) WHERE s.value > $min RETURN c,r,s ORDER BY s.value DESC LIMIT 100",
+    "query_id": "cypher:high_risk_scores",
+}
+
+
+def _fallback(text):
+    return {"score": 0.5, "query": text, "query_id": "nl:fallback"}
+
+
+def test_single_keyword_then_fallback():
+    assert semantic_search_candidates("show recent disputes") == {
+        "matches": [DISPUTES, _fallback("show recent disputes")],
+        "summary": SUMMARY,
+    }
+    assert semantic_search_candidates("customers with HIGH RISK")["matches"] == [
+        HIGH_RISK,
+        _fallback("customers with HIGH RISK"),
+    ]
+
+
+def test_templates_keep_declaration_order():
+    for text in ("dispute and risk score", "risk score and dispute"):
+        assert semantic_search_candidates(text)["matches"] == [
+            DISPUTES,
+            HIGH_RISK,
+            _fallback(text),
+        ]
+
+
+def test_top_k_truncates():
+    text = "dispute and risk score"
+    assert semantic_search_candidates(text, 2)["matches"] == [DISPUTES, HIGH_RISK]
+    assert semantic_search_candidates(text, 1)["matches"] == [DISPUTES]
+
+
+def test_fallback_uses_stripped_text():
+    assert semantic_search_candidates("  hello  ")["matches"] == [_fallback("hello")]
+    assert semantic_search_candidates("")["matches"] == [_fallback("")]
+
+
+def test_results_are_independent_copies():
+    first = semantic_search_candidates("show recent disputes")
+    first["matches"][0]["score"] = 0.0
+    second = semantic_search_candidates("show recent disputes")
+    assert second["matches"][0] == DISPUTES